@@ -1,3 +1,3 @@
-from .session import SolanaSession
+from .session import SolanaSession, SwapResult
 from .jupiter_transaction import Transaction
-__all__ = ["SolanaSession", "Transaction"]
+__all__ = ["SolanaSession", "SwapResult", "Transaction"]
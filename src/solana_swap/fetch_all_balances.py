@@ -9,24 +9,47 @@ from wallet import SolanaWallet
 w = SolanaWallet.from_env()
 w.refresh_balances()          # lamports / token units
 w.refresh_prices()            # USD quotes
+w.refresh_all()               # both, with the network calls overlapped
 print(w.sol_info.usd_price)   # latest SOL-USD
 print(w.balances['EPjFWd…'].value_usd)
 """
 
 from __future__ import annotations
 
+import base64
 import datetime as dt
 import os
+import struct
 import sys
-from typing import Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from solders.pubkey import Pubkey
+from urllib3.util.retry import Retry
 
-from jupiter_helper import get_price, is_mint_tradable
+from jupiter_helper import get_prices
 
 # Wrapped-SOL mint used by Jupiter’s price API
 WSOL_MINT = "So11111111111111111111111111111111111111112"
 
+# SPL layouts: token account starts with mint(32) | owner(32) | amount(u64);
+# mint account stores decimals as a u8 at byte 44.
+_TOKEN_ACCT_HEAD = struct.Struct("<32s32sQ")
+_MINT_DECIMALS_OFFSET = 44
+_MAX_ACCOUNTS_PER_CALL = 100     # getMultipleAccounts cap
+
+# Keep-alive pool shared by every RPC call (one TLS handshake, not one per call)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=32,
+                max_retries=Retry(total=2, backoff_factor=0.2)),
+)
+
 
 # ──────────────────────────────────────────────────────────────────────────
 # Data containers
@@ -39,21 +62,34 @@ class TokenInfo:
     ----------
     mint : str                SPL mint (or "SOL")
     amount : float            Balance in on-chain units
+    raw_amount : int | None   Exact balance in base units (lamports etc.)
+    decimals : int | None     `amount == raw_amount / 10**decimals`
     balance_at : datetime     When `amount` was last fetched
     usd_price : float | None  Latest quote
     price_at : datetime | None
     """
 
-    __slots__ = ("mint", "amount", "balance_at", "usd_price", "price_at")
+    __slots__ = ("mint", "amount", "raw_amount", "decimals",
+                 "balance_at", "usd_price", "price_at")
 
-    def __init__(self, mint: str, amount: float):
+    def __init__(self, mint: str, amount: float, *,
+                 raw_amount: Optional[int] = None,
+                 decimals: Optional[int] = None):
         self.mint: str = mint
         self.amount: float = amount
+        self.raw_amount: Optional[int] = raw_amount
+        self.decimals: Optional[int] = decimals
         self.balance_at: dt.datetime = dt.datetime.utcnow()
 
         self.usd_price: Optional[float] = None
         self.price_at: Optional[dt.datetime] = None
 
+    @classmethod
+    def from_raw(cls, mint: str, raw_amount: int, decimals: int) -> "TokenInfo":
+        """Build from an exact base-unit amount; `amount` is derived."""
+        return cls(mint, raw_amount / 10 ** decimals,
+                   raw_amount=raw_amount, decimals=decimals)
+
     # ────────────────────────────────
     # helpers
     # ────────────────────────────────
@@ -82,11 +118,14 @@ class SolanaWallet:
         self.pubkey = pubkey
 
         # SOL is stored in its own TokenInfo for uniform access
-        self.sol_info: TokenInfo = TokenInfo("SOL", 0.0)
+        self.sol_info: TokenInfo = TokenInfo.from_raw("SOL", 0, 9)
 
         # mint → TokenInfo (excl. SOL)
         self.balances: Dict[str, TokenInfo] = {}
 
+        # mint → decimals (immutable, so cached across refreshes)
+        self._decimals: Dict[str, int] = {}
+
     # ────────────────────────────────
     # Construction helpers
     # ────────────────────────────────
@@ -109,37 +148,85 @@ class SolanaWallet:
     # Public API
     # ────────────────────────────────
     def refresh_balances(self) -> None:
-        """Update SOL + token balances and timestamps."""
-        self.sol_info.amount = self._get_sol_balance()
+        """
+        Update SOL + token balances and timestamps.
+
+        One batched RPC POST, plus one more only when new mints need decimals.
+        """
+        calls = [("getBalance", [self.pubkey])] + [
+            (
+                "getTokenAccountsByOwner",
+                [
+                    self.pubkey,
+                    {"programId": prog},
+                    {
+                        "encoding": "base64",
+                        "dataSlice": {"offset": 0, "length": _TOKEN_ACCT_HEAD.size},
+                    },
+                ],
+            )
+            for prog in self.TOKEN_PROGRAMS
+        ]
+        sol_res, *token_res = self._rpc_batch(calls)
+
+        self.sol_info.raw_amount = sol_res["value"]
+        self.sol_info.amount = sol_res["value"] / 1e9
         self.sol_info.balance_at = dt.datetime.utcnow()
-        self.balances = self._get_all_token_balances()
+        self.balances = self._aggregate_token_accounts(token_res)
 
     def refresh_prices(self) -> None:
         """
         Fetch USD prices for SOL and every routable token.
 
-        Non-tradable mints are skipped silently.
+        Mints missing from Jupiter's response are treated as non-tradable
+        and skipped silently.
         """
-        # SOL (via wrapped-SOL mint)
         try:
-            sol_price = get_price(WSOL_MINT)
-            self.sol_info.set_price(sol_price)
+            prices = get_prices([WSOL_MINT, *self.balances])
         except Exception:
             # Leave usd_price None if fetch fails
-            pass
+            return
+        self._apply_prices(prices)
 
-        # Tokens
-        for mint, info in self.balances.items():
-            if not is_mint_tradable(mint):
-                continue
+    def refresh_all(self) -> None:
+        """
+        Refresh balances and prices with the two network legs overlapped.
+
+        Prices for SOL and every mint already held are fetched while the
+        balance RPC is in flight; only mints first seen in this refresh
+        need a second price request.
+        """
+        known = {WSOL_MINT, *self.balances}
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            fut = pool.submit(get_prices, list(known))
+            self.refresh_balances()
             try:
-                info.set_price(get_price(mint))
+                prices = fut.result()
+                todo = [m for m in self.balances if m not in known]
             except Exception:
-                continue
+                prices, todo = {}, [WSOL_MINT, *self.balances]
+
+        if todo:
+            try:
+                prices.update(get_prices(todo))
+            except Exception:
+                pass
+        self._apply_prices(prices)
+
+    def _apply_prices(self, prices: Dict[str, float]) -> None:
+        # SOL (via wrapped-SOL mint)
+        if WSOL_MINT in prices:
+            self.sol_info.set_price(prices[WSOL_MINT])
+
+        # Tokens
+        for mint, info in self.balances.items():
+            price = prices.get(mint)
+            if price is not None:
+                info.set_price(price)
 
     def display(self) -> None:
         """Console table — amount + USD conversion (if available)."""
-        col_w = max(3, *(len(m) for m in self.balances))  # ≥ len('SOL')
+        col_w = max(3, max(map(len, self.balances), default=0))  # ≥ len('SOL')
         headers = ("Mint address".ljust(col_w), "Balance", "Value (USD)")
         print("\n=== Wallet ===")
         print(f"{headers[0]}  {headers[1]:>15}  {headers[2]:>15}")
@@ -162,41 +249,74 @@ class SolanaWallet:
     # ────────────────────────────────
     # RPC helpers
     # ────────────────────────────────
-    def _rpc(self, method: str, params):
-        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
-        resp = requests.post(self.RPC_ENDPOINT, json=payload, timeout=15)
+    def _rpc_batch(self, calls: List[Tuple[str, list]]) -> List[dict]:
+        """
+        Send several JSON-RPC calls in one POST.
+
+        Results come back in the same order as `calls`; raises if any
+        element of the batch carries an error.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": m, "params": p}
+            for i, (m, p) in enumerate(calls)
+        ]
+        resp = _SESSION.post(self.RPC_ENDPOINT, json=payload, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
-        if "error" in data:
-            raise RuntimeError(f"RPC error: {data['error']}")
-        return data["result"]
-
-    def _get_sol_balance(self) -> float:
-        lamports = self._rpc("getBalance", [self.pubkey])["value"]
-        return lamports / 1e9
-
-    def _get_all_token_balances(self) -> Dict[str, TokenInfo]:
-        agg: Dict[str, float] = {}
-        for prog in self.TOKEN_PROGRAMS:
-            res = self._rpc(
-                "getTokenAccountsByOwner",
-                [self.pubkey, {"programId": prog}, {"encoding": "jsonParsed"}],
-            )
+        data = orjson.loads(resp.content)
+        if not isinstance(data, list):           # whole batch rejected
+            raise RuntimeError(f"RPC error: {data.get('error', data)}")
+
+        # JSON-RPC allows batch replies in any order
+        data.sort(key=lambda d: d.get("id", -1))
+        for d in data:
+            if "error" in d:
+                raise RuntimeError(f"RPC error: {d['error']}")
+        return [d["result"] for d in data]
+
+    def _aggregate_token_accounts(self, results: List[dict]) -> Dict[str, TokenInfo]:
+        raw: Dict[str, int] = defaultdict(int)
+        b64decode, unpack = base64.b64decode, _TOKEN_ACCT_HEAD.unpack_from
+        for res in results:
             for acct in res["value"]:
-                info = acct["account"]["data"]["parsed"]["info"]
-                mint = info.get("mint", "Unknown")
-                amt = float(info.get("tokenAmount", {}).get("uiAmount", 0))
-                agg[mint] = agg.get(mint, 0.0) + amt
-
-        return {m: TokenInfo(m, a) for m, a in agg.items()}
-
+                mint_b, _owner, amount = unpack(b64decode(acct["account"]["data"][0]))
+                raw[str(Pubkey.from_bytes(mint_b))] += amount
+
+        decimals = self._mint_decimals(list(raw))
+        return {
+            # mint closed (leftover empty Token-2022 account): no decimals to read
+            m: TokenInfo.from_raw(m, a, decimals[m]) if m in decimals
+               else TokenInfo(m, 0.0, raw_amount=a)
+            for m, a in raw.items()
+        }
+
+    def _mint_decimals(self, mints: List[str]) -> Dict[str, int]:
+        """
+        Fill the decimals cache for `mints` (one batched POST for all misses).
 
+        Mints whose account no longer exists are left out of the cache.
+        """
+        missing = [m for m in mints if m not in self._decimals]
+        if missing:
+            chunks = [
+                missing[i:i + _MAX_ACCOUNTS_PER_CALL]
+                for i in range(0, len(missing), _MAX_ACCOUNTS_PER_CALL)
+            ]
+            opts = {
+                "encoding": "base64",
+                "dataSlice": {"offset": _MINT_DECIMALS_OFFSET, "length": 1},
+            }
+            results = self._rpc_batch([("getMultipleAccounts", [c, opts]) for c in chunks])
+            for chunk, res in zip(chunks, results):
+                for mint, acct in zip(chunk, res["value"]):
+                    if acct is None:
+                        continue
+                    self._decimals[mint] = base64.b64decode(acct["data"][0])[0]
+        return self._decimals
 
 if __name__ == "__main__":
     wallet = SolanaWallet.from_env()
     #wallet = SolanaWallet.from_str("H8VeYYAcrPUn6WyagGmaQBcsGkimKgoEeWGVXviZ71bG")
-    wallet.refresh_balances()
-    wallet.refresh_prices()
+    wallet.refresh_all()
     wallet.display()
     #print(wallet.balances['3NZ9JMVBmGAqocybic2c7LQCJScmgsAZ6vQqTDzcqmJh'].usd_price)
     
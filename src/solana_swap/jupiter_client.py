@@ -2,16 +2,22 @@
 #!/usr/bin/env python3
 """
 Minimal Jupiter REST helper.
+
+Calls are async and take a caller-owned `httpx.AsyncClient` (see
+`new_http_client`) so concurrent requests share one HTTP/2 connection.
 """
 
 from __future__ import annotations
 
-import base64
+import binascii
 import os
 from typing import Dict
 
-import requests
+import httpx
+import orjson
+from solders.transaction import VersionedTransaction
 
+from token_utils import POW10
 
 
 JUP_QUOTE = "https://lite-api.jup.ag/swap/v1/quote"
@@ -20,28 +26,38 @@ SLIPPAGE_BPS = int(os.getenv("SLIPPAGE_BPS", 50))  # default 0.50 %
 
 # ---------------------------------------------------------------------------
 
-def _req(url: str, method: str = "get", **kw) -> Dict:
+def new_http_client() -> httpx.AsyncClient:
+    """HTTP/2 client for Jupiter: one TLS handshake, multiplexed streams."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=8,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+    )
+
+
+async def _req(http: httpx.AsyncClient, url: str, method: str = "get", **kw) -> Dict:
     """One wrapper for all HTTP calls (raises on non-200)."""
-    r = requests.request(method, url, timeout=8, **kw)
+    r = await http.request(method, url, **kw)
     if r.status_code != 200:
         raise RuntimeError(f"{url} → {r.status_code}: {r.text}")
-    return r.json()
+    return orjson.loads(r.content)
 
 # ---------------------------------------------------------------------------
 # Public helpers
 # ---------------------------------------------------------------------------
 
-def get_quote(input_mint: str,
-              output_mint: str,
-              amount: int,
-              slippage: int = SLIPPAGE_BPS) -> Dict:
+async def get_quote(http: httpx.AsyncClient,
+                    input_mint: str,
+                    output_mint: str,
+                    amount: int,
+                    slippage: int = SLIPPAGE_BPS) -> Dict:
     params = dict(
         inputMint=input_mint,
         outputMint=output_mint,
         amount=amount,
         slippageBps=slippage,
     )
-    rsp = _req(JUP_QUOTE, params=params)
+    rsp = await _req(http, JUP_QUOTE, params=params)
 
     if "data" in rsp and rsp["data"]:
         return rsp["data"][0]
@@ -63,12 +79,11 @@ def total_fees_ui(quote: Dict) -> float:
     Sum `feeAmount` from every leg of routePlan and convert to *dst-token* units.
     Returns 0.0 if Jupiter omitted fee data.
     """
-    total = 0.0
-    for leg in quote.get("routePlan", []):
-        fee  = leg.get("feeAmount", 0)
-        dec  = leg.get("feeMintDecimals", 0)
-        total += float(fee) / 10 ** dec
-    return total
+    raw_by_dec: Dict[int, int] = {}
+    for leg in quote.get("routePlan", ()):
+        dec = leg.get("feeMintDecimals", 0)
+        raw_by_dec[dec] = raw_by_dec.get(dec, 0) + int(leg.get("feeAmount", 0))
+    return sum((raw / POW10[dec] for dec, raw in raw_by_dec.items()), 0.0)
 
 def price_impact_pct(quote: Dict) -> float | None:
     """Return price impact as float (pct) if present."""
@@ -78,7 +93,10 @@ def price_impact_pct(quote: Dict) -> float | None:
         return None
 
 
-def build_swap_tx(quote: Dict, user_pubkey: str) -> bytes:
+async def build_swap_tx(http: httpx.AsyncClient,
+                        quote: Dict,
+                        user_pubkey: str) -> VersionedTransaction:
+    """Ask Jupiter for the unsigned swap tx and return it already parsed."""
     body = {
         "quoteResponse": quote,
         "userPublicKey": user_pubkey,
@@ -87,8 +105,13 @@ def build_swap_tx(quote: Dict, user_pubkey: str) -> bytes:
         "computeUnitPriceMicroLamports": None,
         "feeAccount": None,
     }
-    raw_b64 = _req(JUP_SWAP, method="post", json=body)["swapTransaction"]
-    return base64.b64decode(raw_b64)
+    rsp = await _req(
+        http, JUP_SWAP, method="post",
+        content=orjson.dumps(body), headers={"Content-Type": "application/json"},
+    )
+    raw_b64 = rsp["swapTransaction"]
+    raw = binascii.a2b_base64(raw_b64)           # C decoder, no Python-level checks
+    return VersionedTransaction.from_bytes(raw)
 
 
 
@@ -13,14 +13,34 @@ get_price(mint_address: str,
           vs_token: str | None = None,
           show_extra_info: bool = False) -> float
     Latest quoted price.  Defaults to USD denomination.
+
+get_prices(mints: Iterable[str]) -> dict[str, float]
+    USD prices for many mints in a single request.
 """
 
 from __future__ import annotations
-from typing import Optional
-import requests, os
+from typing import Dict, Iterable, Optional
+import requests, os, time
+
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Jupiter endpoints
 JUPITER_PRICE_URL = "https://lite-api.jup.ag/price/v3"
+MAX_IDS_PER_CALL  = 50      # Price v3 cap on comma-joined `ids`
+PRICE_TTL_SEC     = float(os.getenv("PRICE_TTL_SEC", 5))   # 0 disables caching
+
+# mint → (usd_price, expires_at monotonic); shared by every price helper
+_price_cache: Dict[str, tuple[float, float]] = {}
+
+# Keep-alive pool reused by every Jupiter call (one TLS handshake, not one per call)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=32,
+                max_retries=Retry(total=2, backoff_factor=0.2)),
+)
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -29,16 +49,12 @@ def is_mint_tradable(mint_address: str) -> bool:
     """
     Return True if `mint_address` has a current USD price from Price v3.
     This is a pragmatic proxy for tradability without relying on legacy token lists.
+    Goes through `get_price`, so the quote it fetches is cached and a
+    following price lookup for the same mint costs no request.
     """
     try:
-        resp = requests.get(
-            JUPITER_PRICE_URL,
-            params={"ids": mint_address},
-            timeout=15,
-        )
-        resp.raise_for_status()
-        obj = resp.json() 
-        return mint_address in obj and "usdPrice" in obj[mint_address]
+        get_price(mint_address)
+        return True
     except Exception:
         return False
 
@@ -48,6 +64,7 @@ def get_price(
     *,
     vs_token: Optional[str] = None,
     show_extra_info: bool = False,
+    ttl: float = PRICE_TTL_SEC,
 ) -> float:
     """
     Fetch the latest price for `mint_address`.
@@ -56,6 +73,8 @@ def get_price(
     ----------
     mint_address : str
         SPL-token mint to quote. (USD based)
+    ttl : float
+        Serve a cached quote younger than this many seconds.
 
 
     Returns
@@ -70,12 +89,16 @@ def get_price(
     requests.HTTPError
         For non-200 responses.
     """
+    now = time.monotonic()
+    hit = _price_cache.get(mint_address)
+    if hit is not None and hit[1] > now:
+        return hit[0]
+
     params: dict[str, str] = {"ids": mint_address}
-    
 
-    resp = requests.get(JUPITER_PRICE_URL, params=params, timeout=15)
+    resp = _SESSION.get(JUPITER_PRICE_URL, params=params, timeout=15)
     resp.raise_for_status()
-    obj = resp.json() 
+    obj = orjson.loads(resp.content)
 
     entry = obj.get(mint_address)
     price_val = entry.get("usdPrice") if isinstance(entry, dict) else None
@@ -84,7 +107,67 @@ def get_price(
     if price_val is None:
         raise ValueError(f"No price available for mint {mint_address}")
 
-    return float(price_val)
+    price = float(price_val)
+    _price_cache[mint_address] = (price, now + ttl)
+    return price
+
+
+def get_prices(mints: Iterable[str], ttl: float = PRICE_TTL_SEC) -> Dict[str, float]:
+    """
+    Fetch USD prices for many mints with one GET per `MAX_IDS_PER_CALL` mints.
+
+    Uses the pooled keep-alive session, so a typical wallet costs exactly one
+    request; quotes younger than `ttl` seconds come from the cache.  Mints
+    without a Jupiter price are absent from the result.
+
+    Raises
+    ------
+    requests.HTTPError
+        For non-200 responses.
+    """
+    now = time.monotonic()
+    prices, ids = _cache_lookup(mints, now)
+    for i in range(0, len(ids), MAX_IDS_PER_CALL):
+        resp = _SESSION.get(
+            JUPITER_PRICE_URL,
+            params={"ids": ",".join(ids[i:i + MAX_IDS_PER_CALL])},
+            timeout=15,
+        )
+        resp.raise_for_status()
+        fetched = _usd_prices(orjson.loads(resp.content))
+        _cache_store(fetched, now + ttl)
+        prices.update(fetched)
+    return prices
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+def _usd_prices(obj: dict) -> Dict[str, float]:
+    """Pick `usdPrice` out of a Price v3 response, skipping unpriced mints."""
+    return {
+        mint: float(entry["usdPrice"])
+        for mint, entry in obj.items()
+        if isinstance(entry, dict) and entry.get("usdPrice") is not None
+    }
+
+
+def _cache_lookup(mints: Iterable[str], now: float) -> tuple[Dict[str, float], list[str]]:
+    """Split `mints` into fresh cached prices and ids that still need fetching."""
+    hits: Dict[str, float] = {}
+    misses: list[str] = []
+    for mint in dict.fromkeys(mints):             # dedupe, keep order
+        hit = _price_cache.get(mint)
+        if hit is not None and hit[1] > now:
+            hits[mint] = hit[0]
+        else:
+            misses.append(mint)
+    return hits, misses
+
+
+def _cache_store(prices: Dict[str, float], expires_at: float) -> None:
+    for mint, price in prices.items():
+        _price_cache[mint] = (price, expires_at)
 
 
 # ---------------------------------------------------------------------------
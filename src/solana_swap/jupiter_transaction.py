@@ -3,22 +3,64 @@
 
 from __future__ import annotations
 
-import csv, json, os, datetime as dt
-from dataclasses import dataclass, field, asdict
+import asyncio, csv, os, sys, time, datetime as dt
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Any, ClassVar, List
+from typing import Any, Callable, ClassVar, List
 
-from session import SolanaSession
-from jupiter_helper import get_price, is_mint_tradable
-
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+import orjson
 
+from session import SolanaSession, SwapResult
+from token_utils import POW10
+from jupiter_helper import is_mint_tradable
 
 SOL_MINT = "So11111111111111111111111111111111111111112"  # native-SOL pseudo-mint
 _CSV_PATH = "transactions.csv"
+TRADABLE_TTL_SEC = 60      # tradability changes slowly; re-check each minute
+
+
+# mint → monotonic time until which it is known tradable. Only positive
+# answers are kept: is_mint_tradable reports a timeout or 429 as False.
+_tradable_until: dict[str, float] = {}
+
+
+def _is_tradable(mint: str) -> bool:
+    """Memoized `is_mint_tradable`; a False result is always re-checked."""
+    now = time.monotonic()
+    if _tradable_until.get(mint, 0.0) > now:
+        return True
+    ok = is_mint_tradable(mint)
+    if ok:
+        _tradable_until[mint] = now + TRADABLE_TTL_SEC
+    return ok
+
+
+def _units(raw: int, dec: int) -> Decimal:
+    """Exact token units from an integer base-unit amount."""
+    return Decimal(raw).scaleb(-dec) if raw else Decimal(0)
+
+
+def _dec(x: float) -> Decimal:
+    return Decimal(repr(x))
+
+
+def _dec_or_zero(v: str) -> Decimal:
+    return Decimal(v) if v else Decimal(0)
+
+
+def _swap_result(v: str) -> SwapResult:
+    return SwapResult.from_dict(orjson.loads(v))
+
+
+def _converter_for(col: str) -> tuple[str, Callable[[str], Any]]:
+    """(dataclass field, parser) for one CSV column."""
+    if col == "ts_utc":
+        return col, dt.datetime.fromisoformat
+    if col in ("src_token", "dst_token"):
+        return col, str
+    if col == "result_json":
+        return "result", _swap_result
+    return col, _dec_or_zero
 
 
 # ──────────────────────────────────────────────────────────────────────────
@@ -26,8 +68,8 @@ _CSV_PATH = "transactions.csv"
 # ──────────────────────────────────────────────────────────────────────────
 @dataclass(slots=True)
 class Transaction:
-    # raw Jupiter response
-    result: dict[str, Any]
+    # swap outcome (signature, fees, route plan)
+    result: SwapResult
 
     # token identifiers
     src_token: str
@@ -89,6 +131,12 @@ class Transaction:
         "priority_fee_sol_units", "price_impact_pct",
         "result_json",
     ]
+    # attributes written verbatim (everything but the trailing result_json)
+    _ROW_ATTRS: ClassVar[tuple[str, ...]] = tuple(_CSV_HEADER[:-1])
+    # (column, dataclass field, parser) used by load_all
+    _CONVERTERS: ClassVar[tuple[tuple[str, str, Callable[[str], Any]], ...]] = tuple(
+        (col, *_converter_for(col)) for col in _CSV_HEADER
+    )
 
     # =================================================================
     # high-level factory
@@ -104,81 +152,91 @@ class Transaction:
         autoprint: bool = True,
     ) -> "Transaction":
 
-        if not (is_mint_tradable(src_token) and is_mint_tradable(dst_token)):
+        src_ok, dst_ok = await asyncio.gather(
+            asyncio.to_thread(_is_tradable, src_token),
+            asyncio.to_thread(_is_tradable, dst_token),
+        )
+        if not (src_ok and dst_ok):
             raise ValueError("One or both mints are not routable on Jupiter")
 
         owns_session = session is None
-        session = session or SolanaSession()
-        wallet = session.kp.pubkey()
+        session = session or await SolanaSession.create()
+        wallet = session.pubkey
 
         try:
-            # balances BEFORE
-            src_before, dst_before = await session.pair_balances(src_token, dst_token)
-            lamports_before = (await session.primary.get_balance(wallet)).value
-            sol_before = Decimal(lamports_before) / Decimal(1e9)
-
-            # live prices
-            src_price = Decimal(str(get_price(src_token)))
-            dst_price = Decimal(str(get_price(dst_token)))
-            sol_price = Decimal(str(get_price(SOL_MINT)))
+            # balances + decimals + live prices BEFORE (independent reads, run
+            # together). Arithmetic stays int/float; Decimal only at the end.
+            (
+                (src_raw_before, dst_raw_before), sol_resp,
+                src_dec, dst_dec, src_px, dst_px, sol_px,
+            ) = await asyncio.gather(
+                session.pair_raw_balances(src_token, dst_token),
+                session.primary.get_balance(wallet),
+                session.decimals(src_token),
+                session.decimals(dst_token),
+                session.price_usd(src_token),
+                session.price_usd(dst_token),
+                session.price_usd(SOL_MINT),
+            )
+            if not src_px:
+                raise ValueError(f"No USD price for {src_token}")
+            sol_raw_before = sol_resp.value
+            src_scale, dst_scale = POW10[src_dec], POW10[dst_dec]
 
             # before USD snapshots
-            src_before_usd = Decimal(src_before) * src_price
-            dst_before_usd = Decimal(dst_before) * dst_price
-            sol_before_usd = sol_before * sol_price
+            src_before_usd = src_raw_before / src_scale * src_px
+            dst_before_usd = dst_raw_before / dst_scale * dst_px
+            sol_before_usd = sol_raw_before / 1e9 * sol_px
 
             # convert USD→units & swap
-            units = Decimal(usd_amount) / src_price
+            units = float(usd_amount) / src_px
             result = await session.swap(src_token, dst_token, units)
 
             # balances AFTER
-            src_after, dst_after = await session.pair_balances(src_token, dst_token)
-            lamports_after = (await session.primary.get_balance(wallet)).value
-            sol_after = Decimal(lamports_after) / Decimal(1e9)
+            (src_raw_after, dst_raw_after), sol_resp = await asyncio.gather(
+                session.pair_raw_balances(src_token, dst_token),
+                session.primary.get_balance(wallet),
+            )
+            sol_raw_after = sol_resp.value
 
             # after USD snapshots
-            src_after_usd = Decimal(src_after) * src_price
-            dst_after_usd = Decimal(dst_after) * dst_price
-            sol_after_usd = sol_after * sol_price
-
-            # deltas
-            src_delta_units = Decimal(src_after) - Decimal(src_before)
-            dst_delta_units = Decimal(dst_after) - Decimal(dst_before)
-            sol_delta_units = sol_after - sol_before
+            src_after_usd = src_raw_after / src_scale * src_px
+            dst_after_usd = dst_raw_after / dst_scale * dst_px
+            sol_after_usd = sol_raw_after / 1e9 * sol_px
 
             tx = cls(
                 result=result,
                 src_token=src_token,
                 dst_token=dst_token,
-                # units
-                src_before_units=Decimal(src_before),
-                dst_before_units=Decimal(dst_before),
-                sol_before_units=sol_before,
-                src_after_units=Decimal(src_after),
-                dst_after_units=Decimal(dst_after),
-                sol_after_units=sol_after,
-                src_delta_units=src_delta_units,
-                dst_delta_units=dst_delta_units,
-                sol_delta_units=sol_delta_units,
+                # units (exact, from integer base units)
+                src_before_units=_units(src_raw_before, src_dec),
+                dst_before_units=_units(dst_raw_before, dst_dec),
+                sol_before_units=_units(sol_raw_before, 9),
+                src_after_units=_units(src_raw_after, src_dec),
+                dst_after_units=_units(dst_raw_after, dst_dec),
+                sol_after_units=_units(sol_raw_after, 9),
+                src_delta_units=_units(src_raw_after - src_raw_before, src_dec),
+                dst_delta_units=_units(dst_raw_after - dst_raw_before, dst_dec),
+                sol_delta_units=_units(sol_raw_after - sol_raw_before, 9),
                 # USD snapshots & deltas
-                src_before_usd=src_before_usd,
-                dst_before_usd=dst_before_usd,
-                sol_before_usd=sol_before_usd,
-                src_after_usd=src_after_usd,
-                dst_after_usd=dst_after_usd,
-                sol_after_usd=sol_after_usd,
-                src_delta_usd=src_after_usd - src_before_usd,
-                dst_delta_usd=dst_after_usd - dst_before_usd,
-                sol_delta_usd=sol_after_usd - sol_before_usd,
+                src_before_usd=_dec(src_before_usd),
+                dst_before_usd=_dec(dst_before_usd),
+                sol_before_usd=_dec(sol_before_usd),
+                src_after_usd=_dec(src_after_usd),
+                dst_after_usd=_dec(dst_after_usd),
+                sol_after_usd=_dec(sol_after_usd),
+                src_delta_usd=_dec(src_after_usd - src_before_usd),
+                dst_delta_usd=_dec(dst_after_usd - dst_before_usd),
+                sol_delta_usd=_dec(sol_after_usd - sol_before_usd),
                 # prices
-                src_unit_price_usd=src_price,
-                dst_unit_price_usd=dst_price,
-                sol_unit_price_usd=sol_price,
+                src_unit_price_usd=_dec(src_px),
+                dst_unit_price_usd=_dec(dst_px),
+                sol_unit_price_usd=_dec(sol_px),
                 # fees & impact
-                route_fee_dst_units=Decimal(str(result.get("route_fees_ui", 0))),
-                network_fee_sol_units=Decimal(str(result.get("solNetworkFee", 0))),
-                priority_fee_sol_units=Decimal(str(result.get("priorityFeeSol", 0))),
-                price_impact_pct=Decimal(str(result.get("priceImpact", 0))),
+                route_fee_dst_units=_dec(result.route_fees_ui),
+                network_fee_sol_units=_dec(result.sol_network_fee),
+                priority_fee_sol_units=_dec(result.priority_fee_sol),
+                price_impact_pct=_dec(result.price_impact),
             )
 
             tx.save_to_csv()
@@ -194,73 +252,101 @@ class Transaction:
     # persistence
     # -----------------------------------------------------------------
     def save_to_csv(self, path: str = _CSV_PATH) -> None:
-        data = asdict(self)
-        data["result_json"] = json.dumps(data.pop("result"), separators=(",", ":"))
-        row = {col: str(data.get(col, "")) for col in self._CSV_HEADER}
+        # no asdict(): it deep-copies every field just to stringify it
+        row = [str(getattr(self, a)) for a in self._ROW_ATTRS]
+        row.append(orjson.dumps(self.result).decode())
 
         write_header = not os.path.exists(path)
         with open(path, "a", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=self._CSV_HEADER)
+            w = csv.writer(f)
             if write_header:
-                w.writeheader()
+                w.writerow(self._CSV_HEADER)
             w.writerow(row)
 
     # -----------------------------------------------------------------
     # console view
     # -----------------------------------------------------------------
+    # (label, attribute, fee?) in display order; fee=None prints the value
+    # as-is. Attributes missing from the dataclass come from `_print_extras`.
+    _PRINT_SPEC: ClassVar[tuple[tuple[str, str, bool | None], ...]] = (
+        ("UTC time",              "ts_utc",                 None),
+        ("Source token",          "src_token",              None),
+        ("Destination token",     "dst_token",              None),
+        # units before/after
+        ("Src before (units)",    "src_before_units",       False),
+        ("Dst before (units)",    "dst_before_units",       False),
+        ("SOL before (units)",    "sol_before_units",       False),
+        ("Src after  (units)",    "src_after_units",        False),
+        ("Dst after  (units)",    "dst_after_units",        False),
+        ("SOL after  (units)",    "sol_after_units",        False),
+        # USD before/after
+        ("Src before (USD)",      "src_before_usd",         False),
+        ("Dst before (USD)",      "dst_before_usd",         False),
+        ("SOL before (USD)",      "sol_before_usd",         False),
+        ("Src after  (USD)",      "src_after_usd",          False),
+        ("Dst after  (USD)",      "dst_after_usd",          False),
+        ("SOL after  (USD)",      "sol_after_usd",          False),
+        # deltas
+        ("Src delta (units)",     "src_delta_units",        False),
+        ("Dst delta (units)",     "dst_delta_units",        False),
+        ("SOL delta (units)",     "sol_delta_units",        False),
+        ("Src delta (USD)",       "src_delta_usd",          False),
+        ("Dst delta (USD)",       "dst_delta_usd",          False),
+        ("SOL delta (USD)",       "sol_delta_usd",          False),
+        # fees & impact
+        ("Route fee (dst units)", "route_fee_dst_units",    True),
+        ("Route fee (USD)",       "route_fee_usd",          False),
+        ("Fees by mint (units)",  "fees_by_mint",           None),
+        ("Network fee (SOL)",     "network_fee_sol_units",  True),
+        ("Priority fee (SOL)",    "priority_fee_sol_units", True),
+        ("Price impact %",        "price_impact_pct",       False),
+        ("Signature",             "signature",              None),
+    )
+
     def _fmt(self, val: Decimal | float, *, fee: bool = False) -> str:
-        return f"{Decimal(val):.6f}" if fee else f"{Decimal(val):.2f}"
+        # Decimal and float both honour the format spec; no conversion needed
+        return f"{val:.6f}" if fee else f"{val:.2f}"
 
-    def pretty_print(self) -> None:
-        fees_usd = self.result.get("routeFeesUSD")
-        fees_by_mint = self.result.get("routeFeesByMint") or {}
-        if isinstance(fees_by_mint, dict):
+    def _print_extras(self) -> dict[str, Any]:
+        """Display values that aren't dataclass fields (mostly from `result`)."""
+        fees_by_mint = self.result.route_fees_by_mint
+        if fees_by_mint:
             fees_by_mint_str = ", ".join(
                 f"{mint}:{self._fmt(val, fee=True)}" for mint, val in fees_by_mint.items()
-            ) if fees_by_mint else "—"
+            )
         else:
             fees_by_mint_str = "—"
-
-        rec = {
-            "UTC time": self.ts_utc.isoformat(timespec="seconds"),
-            "Source token": self.src_token,
-            "Destination token": self.dst_token,
-            # units before/after
-            "Src before (units)": self._fmt(self.src_before_units),
-            "Dst before (units)": self._fmt(self.dst_before_units),
-            "SOL before (units)": self._fmt(self.sol_before_units),
-            "Src after  (units)": self._fmt(self.src_after_units),
-            "Dst after  (units)": self._fmt(self.dst_after_units),
-            "SOL after  (units)": self._fmt(self.sol_after_units),
-            # USD before/after
-            "Src before (USD)": self._fmt(self.src_before_usd),
-            "Dst before (USD)": self._fmt(self.dst_before_usd),
-            "SOL before (USD)": self._fmt(self.sol_before_usd),
-            "Src after  (USD)": self._fmt(self.src_after_usd),
-            "Dst after  (USD)": self._fmt(self.dst_after_usd),
-            "SOL after  (USD)": self._fmt(self.sol_after_usd),
-            # deltas
-            "Src delta (units)": self._fmt(self.src_delta_units),
-            "Dst delta (units)": self._fmt(self.dst_delta_units),
-            "SOL delta (units)": self._fmt(self.sol_delta_units),
-            "Src delta (USD)":   self._fmt(self.src_delta_usd),
-            "Dst delta (USD)":   self._fmt(self.dst_delta_usd),
-            "SOL delta (USD)":   self._fmt(self.sol_delta_usd),
-            # fees & impact
-            "Route fee (dst units)": self._fmt(self.route_fee_dst_units, fee=True),
-            "Route fee (USD)":       self._fmt(fees_usd or 0.0),
-            "Fees by mint (units)":  fees_by_mint_str,
-            "Network fee (SOL)":     self._fmt(self.network_fee_sol_units, fee=True),
-            "Priority fee (SOL)":    self._fmt(self.priority_fee_sol_units, fee=True),
-            "Price impact %":        self._fmt(self.price_impact_pct),
-            "Signature":             self.result.get("signature", "—"),
+        return {
+            "ts_utc":        self.ts_utc.isoformat(timespec="seconds"),
+            "route_fee_usd": self.result.route_fees_usd,
+            "fees_by_mint":  fees_by_mint_str,
+            "signature":     self.result.signature or "—",
         }
 
-        if pd:
-            df = pd.DataFrame(rec, index=[0]).T.rename(columns={0: "value"})
-            print(df)
-        else:
-            print("\n".join(f"{k:>34}: {v}" for k, v in rec.items()))
+    def pretty_print(self, *, verbose: bool = False) -> None:
+        """
+        Print one `label: value` line per row of `_PRINT_SPEC`.
+
+        `verbose=True` renders the same rows through a pandas DataFrame
+        when pandas is installed; the default path never imports it.
+        """
+        extras = self._print_extras()
+        rows = []
+        for label, attr, fee in self._PRINT_SPEC:
+            val = extras[attr] if attr in extras else getattr(self, attr)
+            rows.append((label, val if fee is None else self._fmt(val, fee=fee)))
+
+        if verbose:
+            try:
+                import pandas as pd
+            except ImportError:
+                pass
+            else:
+                print(pd.DataFrame({"value": dict(rows)}))
+                return
+
+        sys.stdout.write("\n".join(f"{label:>34}: {val}" for label, val in rows))
+        sys.stdout.write("\n")
 
     # -----------------------------------------------------------------
     # loader
@@ -271,13 +357,15 @@ class Transaction:
             return []
         txs: List[Transaction] = []
         with open(path, newline="", encoding="utf-8") as f:
-            for row in csv.DictReader(f):
-                vals = {k: row[k] for k in cls._CSV_HEADER}
-                vals["result"] = json.loads(vals.pop("result_json"))
-                # cast decimals
-                for k, v in vals.items():
-                    if k not in {"ts_utc", "src_token", "dst_token", "result"}:
-                        vals[k] = Decimal(v) if v else Decimal("0")
-                vals["ts_utc"] = dt.datetime.fromisoformat(vals["ts_utc"])
-                txs.append(cls(**vals))  # type: ignore[arg-type]
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return []
+            # resolve column positions once per file, not per row
+            pos = {h: i for i, h in enumerate(header)}
+            plan = [(fld, pos[col], conv) for col, fld, conv in cls._CONVERTERS]
+            for row in reader:
+                if not row:                   # blank line (DictReader skipped these)
+                    continue
+                txs.append(cls(**{fld: conv(row[i]) for fld, i, conv in plan}))
         return txs
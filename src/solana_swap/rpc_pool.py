@@ -17,6 +17,9 @@ from dotenv import load_dotenv
 load_dotenv() 
 
 REFRESH_SEC = 30
+REFRESH_SLACK_SEC = 15      # refresh at least this long before expiry
+RETRY_SEC = 1               # back-off after a failed refresh
+READY_TIMEOUT_SEC = 15      # max wait for the very first block-hash
 _DEFAULT_COMMIT = Commitment("finalized")
 
 class RpcPool:
@@ -25,7 +28,8 @@ class RpcPool:
     def __init__(self,
                  primary_rpc: str | None = None,
                  fallback_rpc: str | None = None,
-                 commitment: Commitment = _DEFAULT_COMMIT) -> None:
+                 commitment: Commitment = _DEFAULT_COMMIT,
+                 ws_rpc: str | None = None) -> None:
 
         if primary_rpc is None:
             primary_rpc = os.getenv("RPC_PRIMARY")
@@ -33,6 +37,8 @@ class RpcPool:
             raise RuntimeError("Set RPC_PRIMARY env var or pass explicit URL")
 
         self._primary_url = primary_rpc 
+        # http(s)://host → ws(s)://host unless a separate WSS endpoint is given
+        self._ws_url = ws_rpc or os.getenv("RPC_WS") or "ws" + primary_rpc[4:]
         self.primary      = AsyncClient(primary_rpc, commitment=commitment)
         self.backup    = AsyncClient(
             fallback_rpc or os.getenv("RPC_FALLBACK", "https://api.mainnet-beta.solana.com"),
@@ -43,12 +49,23 @@ class RpcPool:
         self._blockhash: Optional[str] = None
         self._expiry: float = 0.0
         self._lock   = asyncio.Lock()
+        self._ready  = asyncio.Event()        # set after first refresh
         self._task   = asyncio.create_task(self._refresh_loop())
 
     # ───────────────────────────── public ─────────────────────────────
     async def get_blockhash(self) -> str:
-        """Guaranteed <90 s old."""
-        if time.time() >= self._expiry:
+        """
+        Guaranteed <90 s old.
+
+        The background loop refreshes ahead of expiry, so callers normally
+        return immediately; only a failing loop pushes the RPC onto them.
+        """
+        if self._blockhash is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), READY_TIMEOUT_SEC)
+            except asyncio.TimeoutError:
+                await self._refresh()         # surface the RPC error
+        elif time.time() >= self._expiry:
             await self._refresh()
         assert self._blockhash                # mypy
         return self._blockhash
@@ -64,12 +81,37 @@ class RpcPool:
         while True:
             try:
                 await self._refresh()
+                delay = min(REFRESH_SEC,
+                            self._expiry - time.time() - REFRESH_SLACK_SEC)
             except Exception:
-                pass
-            await asyncio.sleep(REFRESH_SEC)
+                delay = RETRY_SEC
+            await asyncio.sleep(max(RETRY_SEC, delay))
 
     async def _refresh(self) -> None:
         async with self._lock:
-            resp = await self.primary.get_latest_blockhash()
+            resp = await self._hedged_blockhash()
             self._blockhash = resp.value.blockhash
             self._expiry    = time.time() + 90      # conservative TTL
+            self._ready.set()
+
+    async def _hedged_blockhash(self):
+        """Ask primary + backup at once; first successful answer wins."""
+        pending = {
+            asyncio.create_task(cli.get_latest_blockhash())
+            for cli in (self.primary, self.backup)
+        }
+        err: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in done:
+                    if t.exception() is None:
+                        return t.result()
+                    err = t.exception()
+            assert err is not None
+            raise err
+        finally:
+            for t in pending:
+                t.cancel()
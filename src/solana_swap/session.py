@@ -4,69 +4,216 @@ High-level session: balances, prices, swap orchestration.
 """
 
 from __future__ import annotations
-import asyncio, json, os
-from typing import Tuple
+import asyncio, contextvars, functools, os, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, ClassVar, Tuple
+
+import orjson
 
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
 from solana.rpc.types import TxOpts
+from solana.rpc.websocket_api import connect
 
+from solders.rpc.responses import SignatureNotification
 from solders.signature import Signature
 
 from rpc_pool import RpcPool
-from token_utils import TokenTools
+from token_utils import POW10, TokenTools
 from signer import sign_swap_tx
 from jupiter_client import (
     get_quote,
     build_swap_tx,
+    new_http_client,
     price_impact_pct,
 )
-from jupiter_helper import get_price, is_mint_tradable
+from jupiter_helper import get_price
 
 from dotenv import load_dotenv
 load_dotenv() 
 
-class SolanaSession(TokenTools, RpcPool):
-    """Compose networking + token helpers into one object."""
+CONFIRM_TIMEOUT_SEC = 60    # WSS wait before falling back to polling
+PRICE_WORKERS = 8           # cap on concurrent blocking Jupiter lookups
+BASE_FEE_TTL_SEC = 30       # lamports/signature changes at most per epoch
+
+# commitment levels, weakest first; same values as solders'
+# TransactionConfirmationStatus (Processed=0, Confirmed=1, Finalized=2)
+_COMMIT_RANK = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+# get_transaction result layout depends on the solana-py/solders version:
+# resolve it once here instead of probing with hasattr on every swap.
+try:
+    from solders.transaction_status import (
+        EncodedConfirmedTransactionWithStatusMeta as _TxWithMeta,
+    )
+    _NESTED_META = hasattr(_TxWithMeta, "transaction")       # ≥ 0.30
+except ImportError:
+    _NESTED_META = False                                      # < 0.28
+
+if _NESTED_META:
+    def _extract_fee(val) -> int:
+        meta = val.transaction.meta if val is not None else None
+        return meta.fee if meta is not None else 0
+else:
+    def _extract_fee(val) -> int:
+        meta = val.meta if val is not None else None
+        return meta.fee if meta is not None else 0
+
+
+@functools.lru_cache(maxsize=4)
+def _load_keypair(path: str) -> Keypair:
+    """Parse a wallet file once per process; Keypair is immutable, so share it."""
+    with open(path, "rb") as f:
+        secret = orjson.loads(f.read())
+    return Keypair.from_bytes(bytes(secret))
+
+
+def _wallet_path(wallet_file: str | None) -> str:
+    return wallet_file or os.getenv("WALLET_FILE", "wallet.json")
+
+
+@dataclass(slots=True)
+class SwapResult:
+    """Outcome of one `SolanaSession.swap`."""
+    signature: str
+    dst_ui: float                   # quoted output, destination token units
+    route_fees_ui: float = 0.0      # route fees paid in the destination mint
+    route_fees_usd: float = 0.0     # all route fees in USD (best effort)
+    route_fees_by_mint: dict[str, float] = field(default_factory=dict)
+    price_impact: float = 0.0
+    route_plan: list[dict[str, Any]] | None = None
+    sol_network_fee: float = 0.0    # meta.fee, SOL
+    priority_fee_sol: float = 0.0   # meta.fee minus the base signature fee
+
+    # key names used by the dict `swap` returned before this class existed
+    _LEGACY_KEYS: ClassVar[dict[str, str]] = {
+        "routeFeesUSD":    "route_fees_usd",
+        "routeFeesByMint": "route_fees_by_mint",
+        "priceImpact":     "price_impact",
+        "routePlan":       "route_plan",
+        "solNetworkFee":   "sol_network_fee",
+        "priorityFeeSol":  "priority_fee_sol",
+    }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "SwapResult":
+        """Rebuild from JSON; accepts both field names and the legacy keys."""
+        legacy = cls._LEGACY_KEYS
+        return cls(**{legacy.get(k, k): v for k, v in d.items()})
+
+
+class SolanaSession:
+    """Compose networking (`.rpc`) + token helpers (`.tokens`) into one object."""
+
+    # endpoint URL → (fetched_at monotonic, lamports per signature)
+    _base_fee_cache: dict[str, tuple[float, int]] = {}
 
     def __init__(self, wallet_file: str | None = None, **kw) -> None:
-        RpcPool.__init__(self, **kw)
-        TokenTools.__init__(self)
+        """Sync constructor: reads the wallet file on the calling thread."""
+        self._setup(_load_keypair(_wallet_path(wallet_file)), **kw)
+
+    @classmethod
+    async def create(cls, wallet_file: str | None = None, **kw) -> "SolanaSession":
+        """Async constructor: the wallet file is read off the event loop."""
+        kp = await asyncio.to_thread(_load_keypair, _wallet_path(wallet_file))
+        self = cls.__new__(cls)
+        self._setup(kp, **kw)
+        return self
+
+    def _setup(self, kp: Keypair, **kw) -> None:
+        self.rpc    = RpcPool(**kw)
+        self.tokens = TokenTools(self.rpc.primary, self.rpc.backup, self.rpc._primary_url)
+
+        self.kp = kp
+        self.pubkey = self.kp.pubkey()
+        self._pubkey_str = str(self.pubkey)
+
+        # app-owned pool: bounded concurrency towards Jupiter's price API
+        self._price_pool = ThreadPoolExecutor(
+            max_workers=PRICE_WORKERS, thread_name_prefix="px"
+        )
+        # quote / swap-build requests share one HTTP/2 connection
+        self._jup_http = new_http_client()
+
+    async def close(self) -> None:
+        await self.rpc.close()
+        await self.tokens.close()
+        await self._jup_http.aclose()
+        self._price_pool.shutdown(wait=False)
+
+    # ───────────────────────── delegated API ──────────────────────────
+    @property
+    def primary(self) -> AsyncClient:
+        return self.rpc.primary
+
+    @property
+    def backup(self) -> AsyncClient:
+        return self.rpc.backup
+
+    @property
+    def commitment(self) -> Commitment:
+        return self.rpc.commitment
 
-        wallet_file = wallet_file or os.getenv("WALLET_FILE", "wallet.json")
-        with open(wallet_file, "r", encoding="utf-8") as f:
-            secret = json.load(f)
-        self.kp = Keypair.from_bytes(bytes(secret))
+    async def get_blockhash(self) -> str:
+        return await self.rpc.get_blockhash()
+
+    async def decimals(self, mint: str) -> int:
+        return await self.tokens.decimals(mint)
+
+    async def ui_balance(self, mint: str, owner: Pubkey) -> float:
+        return await self.tokens.ui_balance(mint, owner)
 
     # ───────────────────────── balances / prices ──────────────────────
     async def price_usd(self, mint: str) -> float:
-        if not is_mint_tradable(mint):
+        """USD price, or 0.0 when Jupiter has no quote (i.e. not tradable)."""
+        try:
+            return await self._in_price_pool(get_price, mint)
+        except ValueError:
             return 0.0
-        return await asyncio.to_thread(get_price, mint)
 
     async def pair_balances(self, src: str, dst: str) -> Tuple[float, float]:
-        owner = self.kp.pubkey()
-        return (
-            await self.ui_balance(src, owner),
-            await self.ui_balance(dst, owner),
-        )
+        """Both balances from one batched RPC round-trip."""
+        src_bal, dst_bal = await self.tokens.ui_balances([src, dst], self.pubkey)
+        return src_bal, dst_bal
+
+    async def pair_raw_balances(self, src: str, dst: str) -> Tuple[int, int]:
+        """Like `pair_balances`, in exact base units (no float division)."""
+        src_raw, dst_raw = await self.tokens.raw_balances([src, dst], self.pubkey)
+        return src_raw, dst_raw
 
     # ───────────────────────── swap ───────────────────────────────────
-    async def swap(self, src: str, dst: str, src_ui: float):
+    async def swap(self, src: str, dst: str, src_ui: float) -> SwapResult:
         if src_ui <= 0:
             raise ValueError("Amount must be positive")
 
-        lamports = int(src_ui * 10 ** await self.decimals(src))
+        await self.tokens.prefetch_decimals(src, dst)   # one RPC for both cache misses
+        src_dec, dst_dec = await asyncio.gather(
+            self.tokens.decimals(src), self.tokens.decimals(dst)
+        )
+        # via Decimal: float * 10**9 can land one lamport short
+        lamports = int(Decimal(str(src_ui)) * POW10[src_dec])
 
-        quote = get_quote(src, dst, lamports)
+        quote = await get_quote(self._jup_http, src, dst, lamports)
         if "outAmount" not in quote:
             raise RuntimeError("No swap route")
 
-        raw    = build_swap_tx(quote, str(self.kp.pubkey()))
-        tx     = sign_swap_tx(raw, self.kp)
-        sig    = await self._submit(tx)
+        tx     = sign_swap_tx(
+            await build_swap_tx(self._jup_http, quote, self._pubkey_str), self.kp
+        )
+
+        # fee schedule doesn't depend on our tx: fetch it while we confirm
+        base_fee_task = asyncio.create_task(self.base_sig_fee_lamports(self.rpc.primary))
+        try:
+            sig = await self._submit(tx)
+        except BaseException:
+            base_fee_task.cancel()
+            raise
 
-        dst_ui = float(quote["outAmount"]) / 10 ** await self.decimals(dst)
+        dst_ui = int(quote["outAmount"]) / POW10[dst_dec]
         
         
         # Improved fee accounting:
@@ -81,14 +228,14 @@ class SolanaSession(TokenTools, RpcPool):
             if not fee_amt or not fee_mint:
                 continue
             try:
-                dec = await self.decimals(fee_mint)
-                fee_ui = float(fee_amt) / (10 ** dec)
+                dec = await self.tokens.decimals(fee_mint)
+                fee_ui = int(fee_amt) / POW10[dec]
                 fees_by_mint_ui[fee_mint] = fees_by_mint_ui.get(fee_mint, 0.0) + fee_ui
                 if fee_mint == dst:
                     total_fees_dst_units += fee_ui
                 # USD conversion is best effort
                 try:
-                    p = await asyncio.to_thread(get_price, fee_mint)
+                    p = await self._in_price_pool(get_price, fee_mint)
                     total_fees_usd += fee_ui * float(p)
                 except Exception:
                     pass
@@ -99,23 +246,16 @@ class SolanaSession(TokenTools, RpcPool):
         price_impact  = price_impact_pct(quote)
         
 
-        tx_meta = await self.primary.get_transaction(
-            Signature.from_string(sig),
-            encoding="jsonParsed",
-            max_supported_transaction_version=0,
+        tx_meta, base_fee = await asyncio.gather(
+            self.rpc.primary.get_transaction(
+                Signature.from_string(sig),
+                encoding="jsonParsed",
+                max_supported_transaction_version=0,
+            ),
+            base_fee_task,
         )
 
-        # handle both old and new structures in solana-py
-        val = tx_meta.value
-        if val is None:
-            lamports_fee = 0
-        elif hasattr(val, "meta"):                       # < solana-py 0.28
-            lamports_fee = val.meta.fee
-        elif hasattr(val, "transaction") and hasattr(val.transaction, "meta"):
-            lamports_fee = val.transaction.meta.fee      # ≥ 0.30
-        else:                                            # future-proof fallback
-            as_dict = getattr(val, "to_json", lambda: val)()
-            lamports_fee = as_dict.get("meta", {}).get("fee", 0)
+        lamports_fee = _extract_fee(tx_meta.value)
 
 
         # base fee = lamportsPerSignature * signature_count (Jupiter tx has 1 sig)
@@ -124,7 +264,6 @@ class SolanaSession(TokenTools, RpcPool):
         
         # -- network / priority fee ---------------------------
         #lamports_fee = fee_meta    # meta.fee you extracted earlier
-        base_fee     = await self.base_sig_fee_lamports(self.primary)
         
         priority_fee = max(lamports_fee - base_fee, 0)
         sol_fee      = lamports_fee / 1e9
@@ -133,23 +272,36 @@ class SolanaSession(TokenTools, RpcPool):
 
         
 
-        return {
-            "signature":   sig,
-            "dst_ui":      dst_ui,
-            "route_fees_ui":     total_fees_dst_units,   # fees denominated in destination token units
-            "routeFeesUSD":      total_fees_usd,         # total fees converted to USD (best effort)
-            "routeFeesByMint":   fees_by_mint_ui,        # dict of fee-mint → fee in that mint's units
-            "priceImpact": price_impact,
-            "routePlan":   quote.get("routePlan"),
-            "solNetworkFee": sol_fee,
-            "priorityFeeSol": priority_sol
-        }        
-        
+        return SwapResult(
+            signature=sig,
+            dst_ui=dst_ui,
+            route_fees_ui=total_fees_dst_units,     # fees denominated in destination token units
+            route_fees_usd=total_fees_usd,          # total fees converted to USD (best effort)
+            route_fees_by_mint=fees_by_mint_ui,     # dict of fee-mint → fee in that mint's units
+            price_impact=price_impact or 0.0,       # None when the quote omits it
+            route_plan=quote.get("routePlan"),
+            sol_network_fee=sol_fee,
+            priority_fee_sol=priority_sol,
+        )
+
     async def base_sig_fee_lamports(self, client: AsyncClient) -> int:
         """
         Return lamports_per_signature according to the current fee schedule.
         Works on solana-py 0.30+; falls back to 5_000 lamports if needed.
+        Cached per endpoint for `BASE_FEE_TTL_SEC`.
         """
+        key = str(client._provider.endpoint_uri)
+        hit = self._base_fee_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < BASE_FEE_TTL_SEC:
+            return hit[1]
+        fee = await self._fetch_base_sig_fee(client)
+        if fee is not None:
+            self._base_fee_cache[key] = (time.monotonic(), fee)
+            return fee
+        # Absolute fallback: default network fee
+        return 5_000      # lamports
+
+    async def _fetch_base_sig_fee(self, client: AsyncClient) -> int | None:
         try:
             latest = await client.get_latest_blockhash()
             # New API exposes it under 'value.feePerSignature' (>=1.18 RPC)
@@ -163,19 +315,55 @@ class SolanaSession(TokenTools, RpcPool):
                 return fee_resp.value
         except Exception:
             pass
-        # Absolute fallback: default network fee
-        return 5_000      # lamports
+        return None
 
 
     # ───────────────────────── internals ──────────────────────────────
+    async def _in_price_pool(self, fn, *args):
+        """`to_thread` on our pool, skipping the context wrapper when it's empty."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        if not ctx:
+            return await loop.run_in_executor(self._price_pool, fn, *args)
+        return await loop.run_in_executor(self._price_pool, ctx.run, fn, *args)
+
     async def _submit(self, tx):
-        sig = await self.primary.send_raw_transaction(
+        sig = await self.rpc.primary.send_raw_transaction(
             bytes(tx),
             opts=TxOpts(skip_preflight=False, preflight_commitment="processed")
         )
-        await self.primary.confirm_transaction(sig.value, self.commitment)
+        await self._confirm(sig.value)
         return str(sig.value)
-    
-    
-    
-    
+
+    async def _confirm(self, sig: Signature) -> None:
+        """Wait for `sig` via signatureSubscribe; poll over HTTP if WSS fails."""
+        try:
+            await asyncio.wait_for(self._await_signature(sig), CONFIRM_TIMEOUT_SEC)
+            return
+        except Exception:
+            pass
+        await self.rpc.primary.confirm_transaction(sig, self.rpc.commitment)
+
+    async def _await_signature(self, sig: Signature) -> None:
+        async with connect(self.rpc._ws_url) as ws:
+            await ws.signature_subscribe(sig, self.rpc.commitment)
+            await ws.recv()                             # subscription ack
+            # the tx may have reached our commitment before the subscription
+            # went live; the node won't push a notification for that
+            if await self._signature_landed(sig):
+                return
+            async for msgs in ws:
+                if any(isinstance(m, SignatureNotification) for m in msgs):
+                    return
+        raise ConnectionError("WSS closed before notification")
+
+    async def _signature_landed(self, sig: Signature) -> bool:
+        """True if `sig` already has the session commitment (one HTTP call)."""
+        resp = await self.rpc.primary.get_signature_statuses([sig])
+        st = resp.value[0]
+        if st is None:
+            return False
+        if st.confirmation_status is None:             # pre-1.5 nodes: rooted
+            return st.confirmations is None
+        want = _COMMIT_RANK.get(str(self.rpc.commitment), 2)
+        return int(st.confirmation_status) >= want
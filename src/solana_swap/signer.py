@@ -4,16 +4,19 @@
 from solders.keypair import Keypair
 from solders.transaction import VersionedTransaction
 
-def sign_swap_tx(raw_tx: bytes, kp: Keypair) -> VersionedTransaction:
+def sign_swap_tx(vt: VersionedTransaction, kp: Keypair) -> VersionedTransaction:
     """
     Jupiter returns a tx template with zeroed signature slot.
-    This writes the payer’s signature at bytes 1..64 and returns
-    a ready-to-send `VersionedTransaction`.
+    This fills the payer’s slot (index 0) of the parsed template with our
+    signature and returns a ready-to-send `VersionedTransaction`.
     """
-    vt = VersionedTransaction.from_bytes(raw_tx)
     payload = b"\x80" + bytes(vt.message)        # v0 prefix
-    sig = kp.sign_message(payload)
+    sigs = list(vt.signatures)
+    sigs[0] = kp.sign_message(payload)
+    return VersionedTransaction.populate(vt.message, sigs)
 
-    buf = bytearray(raw_tx)
-    buf[1:65] = bytes(sig)
-    return VersionedTransaction.from_bytes(bytes(buf))
+
+def sign_swap_tx_batch(vts: list[VersionedTransaction],
+                       kp: Keypair) -> list[VersionedTransaction]:
+    """`sign_swap_tx` for several templates (rebalances, dust sweeps)."""
+    return [sign_swap_tx(vt, kp) for vt in vts]
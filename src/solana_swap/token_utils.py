@@ -2,38 +2,87 @@
 """
 Decimal discovery + balance helpers.
 
-Runs four fallback strategies for decimals: getTokenSupply,
-jsonParsed getAccountInfo, raw layout parse, and a small static map.
+Decimals come from byte 44 of the raw mint account, read with one
+getAccountInfo raced across both RPCs. Well-known mints are preloaded
+from a small static map and never hit the RPC.
 """
 
 from __future__ import annotations
-import base64, math, aiohttp, os
-from typing import Dict, List
+import asyncio, functools, math, aiohttp, os
+from typing import Dict, List, Tuple
 
+import orjson
 from solders.pubkey import Pubkey
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TokenAccountOpts
 
 DEC_OFFSET = 44                            # SPL-Mint: u8 decimals
-STATIC_DEC = {
-    "EPjFWdd5AufqSSqeM2qcxkEzY6BpyHQzdDrRmqw5yHq3": 6,   # USDC
+POW10 = tuple(10 ** i for i in range(256)) # 10**decimals for any u8 value
+STATIC_DEC = {                             # well-known mints (never change)
+    "So11111111111111111111111111111111111111112": 9,    # SOL / wSOL
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": 6,   # USDC
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": 6,   # USDT
     "3NZ9JMVBmGAqocybic2c7LQCJScmgsAZ6vQqTDzcqmJh": 8,   # wBTC
+    "JUPyiwrYJFskUPiHa7hkeR8VUtAeFoSYbKedZNsDvCN": 6,    # JUP
+    "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263": 5,   # BONK
+    "EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm": 6,   # WIF
 }
 
+@functools.lru_cache(maxsize=1024)
+def _pk(mint: str) -> Pubkey:
+    """Cached base58 → Pubkey (hot mints are parsed once per process)."""
+    return Pubkey.from_string(mint)
+
+
+for _mint in STATIC_DEC:                   # warm _pk for the hot mints
+    _pk(_mint)
+del _mint
+
+
 class TokenTools:
-    """Mix-in that expects `.primary` and `.backup` AsyncClients."""
+    """Decimals + balance helpers on top of a primary/backup `AsyncClient` pair."""
+
+    def __init__(self,
+                 primary: AsyncClient,
+                 backup: AsyncClient | None = None,
+                 rpc_url: str | None = None) -> None:
+        self.primary = primary
+        self.backup  = backup or primary
+        self._primary_url = rpc_url               # raw JSON-RPC (ui_balance)
+        self._dec_cache: Dict[str, int] = dict(STATIC_DEC)   # immutable per mint
+        self._http: aiohttp.ClientSession | None = None   # lazy, keep-alive
 
-    _dec_cache: Dict[str, int]
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
 
     async def decimals(self, mint: str) -> int:
-        if not hasattr(self, "_dec_cache"):
-            self._dec_cache = {}
         if mint in self._dec_cache:
             return self._dec_cache[mint]
         d = await self._discover_decimals(mint)
         self._dec_cache[mint] = d
         return d
 
+    async def prefetch_decimals(self, *mints: str) -> None:
+        """
+        Warm the decimals cache for several mints with one getMultipleAccounts.
+
+        Best effort: anything not resolved here is left to `decimals()`.
+        """
+        missing = [m for m in dict.fromkeys(mints) if m not in self._dec_cache]
+        if not missing:
+            return
+        try:
+            r = await self.primary.get_multiple_accounts(
+                [_pk(m) for m in missing]
+            )
+            for mint, acct in zip(missing, r.value):
+                if acct is not None and len(acct.data) > DEC_OFFSET:
+                    self._dec_cache[mint] = acct.data[DEC_OFFSET]
+        except Exception:
+            pass
+
     async def ui_balance(self, mint: str, owner: Pubkey) -> float:
         """Return balance in user-friendly units."""
         body = {
@@ -46,52 +95,101 @@ class TokenTools:
                 {"encoding": "jsonParsed", "commitment": "finalized"},
             ],
         }
-        async with aiohttp.ClientSession() as sess:
-            async with sess.post(self._primary_url, json=body) as r:
-                raw = await r.json()
+        sess = await self._session()
+        async with sess.post(self._primary_url, json=body) as r:
+            r.raise_for_status()
+            raw = orjson.loads(await r.read())
 
-        lamports = sum(
-            int(acc["account"]["data"]["parsed"]["info"]["tokenAmount"]["amount"])
-            for acc in raw.get("result", {}).get("value", [])
+        lamports = _sum_token_amounts(raw.get("result", {}))
+        return lamports / POW10[await self.decimals(mint)]
+
+    async def ui_balances(self, mints: List[str], owner: Pubkey) -> List[float]:
+        """Balances for several mints in one batched JSON-RPC POST."""
+        raws, decs = await asyncio.gather(
+            self.raw_balances(mints, owner),
+            asyncio.gather(*(self.decimals(m) for m in mints)),
         )
-        return lamports / 10 ** await self.decimals(mint)
+        return [r / POW10[d] for r, d in zip(raws, decs)]
+
+    async def raw_balances(self, mints: List[str], owner: Pubkey) -> List[int]:
+        """Exact base-unit balances for several mints, one batched POST."""
+        opts = {"encoding": "jsonParsed", "commitment": "finalized"}
+        calls = [
+            ("getTokenAccountsByOwner", [str(owner), {"mint": m}, opts])
+            for m in mints
+        ]
+        return [_sum_token_amounts(r) for r in await self._rpc_batch(calls)]
 
     # ───────────────────────────── private ────────────────────────────
+    async def _rpc_batch(self, calls: List[Tuple[str, list]]) -> List[dict]:
+        """
+        POST several JSON-RPC calls as one batch.
+
+        Results come back in the same order as `calls`; raises if any
+        element of the batch carries an error.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": m, "params": p}
+            for i, (m, p) in enumerate(calls)
+        ]
+        sess = await self._session()
+        async with sess.post(self._primary_url, json=payload) as r:
+            r.raise_for_status()                 # 429/5xx bodies aren't JSON
+            data = orjson.loads(await r.read())
+        if not isinstance(data, list):           # single error object
+            raise RuntimeError(f"RPC error: {data.get('error', data)}")
+
+        data.sort(key=lambda d: d.get("id", -1))   # reply order isn't guaranteed
+        for d in data:
+            if "error" in d:
+                raise RuntimeError(f"RPC error: {d['error']}")
+        return [d["result"] for d in data]
+
+    async def _session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session so raw JSON-RPC calls reuse TCP+TLS connections."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                json_serialize=lambda o: orjson.dumps(o).decode(),
+            )
+        return self._http
+
     async def _discover_decimals(self, mint: str) -> int:
-        pub = Pubkey.from_string(mint)
-
-        # try token-supply then jsonParsed account-info
-        for cli in (self.primary, self.backup):
-            try:
-                r = await cli.get_token_supply(pub)
-                if r.value:
-                    return int(r.value.decimals)
-            except Exception:
-                pass
-            try:
-                r = await cli.get_account_info(pub, encoding="jsonParsed")
-                if r.value:
-                    return int(r.value.data["parsed"]["info"]["decimals"])
-            except Exception:
-                pass
-
-        # raw base64 layout
-        for cli in (self.primary, self.backup):
-            try:
-                r = await cli.get_account_info(pub)        # default b64
-                if r.value:
-                    raw = base64.b64decode(r.value.data[0])
-                    return raw[DEC_OFFSET]
-            except Exception:
-                pass
-
-        if mint in STATIC_DEC:
-            return STATIC_DEC[mint]
+        """One base64 getAccountInfo per client, first usable answer wins."""
+        pub = _pk(mint)
+        clients = tuple(dict.fromkeys((self.primary, self.backup)))
+        pending = {asyncio.ensure_future(_raw_decimals(cli, pub)) for cli in clients}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in done:
+                    if not t.exception() and t.result() is not None:
+                        return t.result()
+        finally:
+            for t in pending:
+                t.cancel()
 
         raise RuntimeError(f"Decimals unavailable for {mint}")
 
+
+def _sum_token_amounts(result: dict) -> int:
+    """Total raw amount across a jsonParsed getTokenAccountsByOwner result."""
+    return sum(
+        int(acc["account"]["data"]["parsed"]["info"]["tokenAmount"]["amount"])
+        for acc in result.get("value", [])
+    )
+
+
+async def _raw_decimals(cli: AsyncClient, pub: Pubkey) -> int | None:
+    r = await cli.get_account_info(pub)                # base64 → bytes
+    data = r.value.data if r.value else b""
+    return data[DEC_OFFSET] if len(data) > DEC_OFFSET else None
+
+
 # simple stand-alone helper
 async def decimals(client: AsyncClient, mint: str) -> int:
-    tool = TokenTools()
-    tool.primary = tool.backup = client      # hacky: inject dep
-    return await tool.decimals(mint)
+    return await TokenTools(client).decimals(mint)
@@ -0,0 +1,31 @@
+"""Import smoke test: every module must at least load."""
+
+import importlib
+import pathlib
+import sys
+
+import pytest
+
+for dep in ("solders", "solana", "aiohttp", "requests", "httpx", "orjson", "dotenv"):
+    pytest.importorskip(dep)
+
+SRC = pathlib.Path(__file__).resolve().parents[1] / "src"
+# modules import each other flat (`from rpc_pool import RpcPool`)
+sys.path[:0] = [str(SRC / "solana_swap"), str(SRC)]
+
+MODULES = [
+    "token_utils",
+    "rpc_pool",
+    "signer",
+    "jupiter_helper",
+    "jupiter_client",
+    "fetch_all_balances",
+    "session",
+    "jupiter_transaction",
+    "solana_swap",
+]
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_module_imports(name):
+    importlib.import_module(name)